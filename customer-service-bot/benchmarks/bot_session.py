@@ -0,0 +1,99 @@
+"""Benchmark Bot API HTTP sessions against a local fake Bot API server.
+
+Compares aiogram's default session, a session that reconnects for every
+call, and the session built by `make_bot_session` from `Settings`.
+
+Run from the `customer-service-bot` directory:
+
+    python -m benchmarks.bot_session --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from aiohttp import web
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from bot.config import Settings
+from bot.services.session import make_bot_session
+
+BENCH_TOKEN = "123456:bench"
+
+
+def make_fake_api(delay: float) -> web.Application:
+    """Answers every Bot API method like a successful copyMessage."""
+
+    async def handle(request: web.Request) -> web.Response:
+        if delay:
+            await asyncio.sleep(delay)
+        return web.json_response({"ok": True, "result": {"message_id": 1}})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", handle)
+    return app
+
+
+async def run_case(session, requests: int, concurrency: int) -> dict:
+    bot = Bot(token=BENCH_TOKEN, session=session)
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            started = time.perf_counter()
+            await bot.copy_message(chat_id=1, from_chat_id=2, message_id=i)
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await bot.session.close()
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(args):
+    runner = web.AppRunner(make_fake_api(args.delay / 1000))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    api = TelegramAPIServer.from_base(f"http://127.0.0.1:{args.port}")
+
+    settings = Settings(BOT_TOKEN=BENCH_TOKEN, FORUM_GROUP_ID=0)
+
+    no_keepalive = AiohttpSession(api=api)
+    no_keepalive._connector_init["force_close"] = True
+
+    cases = {
+        "no keep-alive": no_keepalive,
+        "aiogram default": AiohttpSession(api=api),
+        "settings-tuned": make_bot_session(settings, api=api),
+    }
+
+    try:
+        print(f"{'session':<18}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, session in cases.items():
+            r = await run_case(session, args.requests, args.concurrency)
+            print(f"{name:<18}{r['rps']:>10.0f}{r['p50']:>10.2f}{r['p99']:>10.2f}")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.0, help="server delay, ms")
+    parser.add_argument("--port", type=int, default=8081)
+    asyncio.run(main(parser.parse_args()))
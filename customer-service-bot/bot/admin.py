@@ -0,0 +1,78 @@
+"""Protected admin endpoints mounted on the webhook aiohttp app.
+
+Every request must carry the `X-Admin-Token` header matching
+`Settings.ADMIN_TOKEN`; the routes are not registered at all without it.
+"""
+
+import asyncio
+import hmac
+import threading
+
+from aiohttp import web
+
+from .config import Settings
+from .services.profiling import SamplingProfiler, SlowUpdateRecorder
+
+
+def setup_admin_routes(
+    app: web.Application, settings: Settings, recorder: SlowUpdateRecorder
+):
+    profiler = SamplingProfiler(interval=settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    # Stop events of running profiles, so shutdown does not wait on them
+    running_stops: set = set()
+
+    @web.middleware
+    async def check_token(request: web.Request, handler):
+        path = request.path
+        if path == settings.ADMIN_PATH or path.startswith(settings.ADMIN_PATH + "/"):
+            token = request.headers.get("X-Admin-Token", "")
+            if not hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+                raise web.HTTPUnauthorized()
+        return await handler(request)
+
+    async def profile(request: web.Request) -> web.Response:
+        """Sample the event loop for ?seconds=N and return collapsed stacks."""
+        try:
+            seconds = float(request.query.get("seconds", "10"))
+        except ValueError:
+            raise web.HTTPBadRequest(text="seconds must be a number")
+        if not 0 < seconds <= settings.PROFILE_MAX_SECONDS:
+            raise web.HTTPBadRequest(
+                text=f"seconds must be in (0, {settings.PROFILE_MAX_SECONDS}]"
+            )
+        if profiler.running:
+            raise web.HTTPConflict(text="Profiler is already running")
+
+        # The handler runs on the event loop thread, which is what we sample
+        loop_thread_id = threading.get_ident()
+        # Set on completion, client disconnect (cancellation) or app shutdown
+        stop = threading.Event()
+        running_stops.add(stop)
+        try:
+            stacks = await asyncio.to_thread(
+                profiler.profile, loop_thread_id, seconds, stop
+            )
+        except RuntimeError as e:
+            raise web.HTTPConflict(text=str(e))
+        finally:
+            stop.set()
+            running_stops.discard(stop)
+
+        return web.Response(
+            text=stacks,
+            headers={"Content-Disposition": 'attachment; filename="profile.folded"'},
+        )
+
+    async def slow_updates(request: web.Request) -> web.Response:
+        return web.json_response(
+            {"threshold_ms": recorder.threshold_ms, "updates": list(recorder.records)}
+        )
+
+    async def stop_profiles(app: web.Application):
+        for stop in list(running_stops):
+            stop.set()
+
+    app.on_shutdown.append(stop_profiles)
+    app.middlewares.append(check_token)
+    app.router.add_get(f"{settings.ADMIN_PATH}/profile", profile)
+    app.router.add_get(f"{settings.ADMIN_PATH}/slow-updates", slow_updates)
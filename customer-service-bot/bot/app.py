@@ -5,11 +5,15 @@ from aiogram.client.default import DefaultBotProperties
 from aiohttp import web
 from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 
+from .admin import setup_admin_routes
 from .config import Settings
 from .database import core as db_core
+from .database.warmup import warm_up
 from .handlers.forum import create_forum_router
 from .handlers.user import create_user_router
 from .database.requests import ConversationRepo, MessageLinkRepo
+from .services.profiling import BotApiTimingMiddleware, SlowUpdateRecorder
+from .services.session import make_bot_session
 
 logger = logging.getLogger(__name__)
 
@@ -49,18 +53,51 @@ def startup_db(engine):
     return on_startup
 
 
+def startup_warmup(engine, session_factory, conv_repo, msg_repo, settings: Settings):
+    """Hook to pre-open DB connections and preload active conversations"""
+
+    async def on_startup():
+        logging.info("Warming up caches...")
+        await warm_up(
+            engine,
+            session_factory,
+            conv_repo,
+            msg_repo,
+            pool_connections=settings.WARMUP_POOL_CONNECTIONS,
+            conversations=settings.WARMUP_CONVERSATIONS,
+            links_per_conversation=settings.WARMUP_LINKS_PER_CONVERSATION,
+            batch_size=settings.WARMUP_BATCH_SIZE,
+            cache_size=settings.LOOKUP_CACHE_SIZE,
+            budget=settings.WARMUP_BUDGET_SECONDS,
+        )
+
+    return on_startup
+
+
 def run():
     settings = Settings()
 
-    bot = Bot(token=settings.BOT_TOKEN, default=DefaultBotProperties(parse_mode="HTML"))
+    bot = Bot(
+        token=settings.BOT_TOKEN,
+        session=make_bot_session(settings),
+        default=DefaultBotProperties(parse_mode="HTML"),
+    )
     dp = Dispatcher()
 
     # 1. Setup Database & Repos
     engine = db_core.make_engine(settings.DATABASE_URL)
     session_factory = db_core.make_session_factory(engine)
 
-    conv_repo = ConversationRepo(session_factory)
-    msg_repo = MessageLinkRepo(session_factory)
+    conv_repo = ConversationRepo(
+        session_factory,
+        cache_size=settings.LOOKUP_CACHE_SIZE,
+        cache_ttl=settings.LOOKUP_CACHE_TTL_SECONDS,
+    )
+    msg_repo = MessageLinkRepo(
+        session_factory,
+        cache_size=settings.LOOKUP_CACHE_SIZE,
+        cache_ttl=settings.LOOKUP_CACHE_TTL_SECONDS,
+    )
 
     # 2. Setup Routers
     forum_router = create_forum_router(settings.FORUM_GROUP_ID, conv_repo, msg_repo)
@@ -69,8 +106,20 @@ def run():
     dp.include_router(forum_router)
     dp.include_router(user_router)
 
+    # 3. Record slow updates with their DB / Bot API timing breakdown
+    recorder = SlowUpdateRecorder(
+        settings.SLOW_UPDATE_THRESHOLD_MS, capacity=settings.SLOW_UPDATE_BUFFER_SIZE
+    )
+    recorder.instrument_engine(engine)
+    bot.session.middleware(BotApiTimingMiddleware())
+    dp.update.outer_middleware(recorder)
+
     # Register DB hook (Common for both modes)
     dp.startup.register(startup_db(engine))
+    if settings.WARMUP_ENABLED:
+        dp.startup.register(
+            startup_warmup(engine, session_factory, conv_repo, msg_repo, settings)
+        )
 
     if settings.ENVIRONMENT == "development":
         logger.info("🚀 Starting in DEV mode (Polling)")
@@ -99,6 +148,9 @@ def run():
         webhook_requests_handler.register(app, path=settings.WEBHOOK_PATH)
         setup_application(app, dp, bot=bot)
 
+        if settings.ADMIN_TOKEN:
+            setup_admin_routes(app, settings, recorder)
+
         # Start Server
         # web.run_app manages its own loop, so no asyncio.run needed
         web.run_app(app, host=settings.WEB_SERVER_HOST, port=settings.WEBSITES_PORT)
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import model_validator
-from typing import Optional
+from pydantic import field_validator, model_validator
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -28,6 +28,51 @@ class Settings(BaseSettings):
     BASE_WEBHOOK_URL: Optional[str] = None
     WEBHOOK_PATH: str = "/webhook"
 
+    # Bot API HTTP session (calls to api.telegram.org)
+    BOT_API_TIMEOUT: float = 60.0
+    BOT_API_CONNECTION_LIMIT: int = 100
+    # 0 means no per-host limit; every call goes to the same host anyway
+    BOT_API_CONNECTION_LIMIT_PER_HOST: int = 0
+    # Seconds an idle connection is kept open for reuse
+    BOT_API_KEEPALIVE_TIMEOUT: float = 30.0
+    BOT_API_DNS_CACHE_TTL: int = 3600
+    # JSON object of Bot API method -> timeout, e.g. '{"copyMessage": 10}'
+    BOT_API_METHOD_TIMEOUTS: Dict[str, float] = {}
+
+    # Profiling. Admin endpoints are only exposed when ADMIN_TOKEN is set.
+    ADMIN_TOKEN: Optional[str] = None
+    ADMIN_PATH: str = "/admin"
+    PROFILE_MAX_SECONDS: int = 60
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+    SLOW_UPDATE_THRESHOLD_MS: float = 1000.0
+    SLOW_UPDATE_BUFFER_SIZE: int = 100
+
+    # In-process cache of conversations / message links (0 disables it)
+    LOOKUP_CACHE_SIZE: int = 0
+    LOOKUP_CACHE_TTL_SECONDS: float = 300.0
+
+    # Startup warm-up. Conversations are only preloaded when the cache is on.
+    # The preload is capped at LOOKUP_CACHE_SIZE conversations and
+    # LOOKUP_CACHE_SIZE links in total, most active users first, so
+    # CONVERSATIONS x LINKS_PER_CONVERSATION above the cache size is cut short.
+    # Preloaded entries are ordered so the least active are evicted first.
+    WARMUP_ENABLED: bool = False
+    WARMUP_POOL_CONNECTIONS: int = 2
+    WARMUP_CONVERSATIONS: int = 1000
+    WARMUP_LINKS_PER_CONVERSATION: int = 20
+    WARMUP_BATCH_SIZE: int = 200
+    # Startup (and so the readiness probe) waits at most this long for warm-up
+    WARMUP_BUDGET_SECONDS: float = 10.0
+
+    @field_validator("ADMIN_PATH")
+    @classmethod
+    def check_admin_path(cls, value: str) -> str:
+        # A bare "/" would put the webhook itself behind the admin token
+        value = value.rstrip("/")
+        if not value.startswith("/"):
+            raise ValueError("ADMIN_PATH must be a sub-path such as '/admin'")
+        return value
+
     # 3. The Fix: Use model_validator (mode='after')
     # This runs AFTER all individual fields are loaded and validated.
     @model_validator(mode="after")
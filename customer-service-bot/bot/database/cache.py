@@ -0,0 +1,56 @@
+"""In-process lookup cache used by the repositories.
+
+Rows the bot looks up on every relay (conversations and message links) never
+change once written; they are only deleted when a topic is closed. Entries
+still expire after `ttl` seconds so that a deletion made by another instance
+is picked up eventually.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LookupCache:
+    """Bounded LRU mapping with per-entry expiry. `maxsize=0` disables it."""
+
+    def __init__(self, maxsize: int = 0, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def touch(self, key: Hashable):
+        """Move `key` to the most recently used end, if present."""
+        if key in self._data:
+            self._data.move_to_end(key)
+
+    def pop(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def evict(self, predicate: Callable[[Hashable, Any], bool]):
+        """Drop every entry for which `predicate(key, value)` is true."""
+        stale = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+        for key in stale:
+            del self._data[key]
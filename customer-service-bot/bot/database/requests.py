@@ -8,25 +8,68 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, Asyn
 from sqlalchemy import select, delete
 from sqlalchemy.exc import IntegrityError
 
+from .cache import LookupCache
 from .models import Conversation, MessageLink
 
 
 class ConversationRepo:
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        cache_size: int = 0,
+        cache_ttl: float = 300.0,
+    ):
         self.session_factory = session_factory
+        self._by_user = LookupCache(cache_size, cache_ttl)
+        self._by_thread = LookupCache(cache_size, cache_ttl)
+        # Bumped when a delete starts and ends. A read that overlapped a
+        # delete may have loaded the row being deleted, so it is not cached.
+        self._delete_epoch = 0
+        self._deletes_in_flight = 0
+
+    def prime(self, conv: Conversation):
+        self._by_user.put(conv.user_id, conv)
+        self._by_thread.put((conv.forum_chat_id, conv.thread_id), conv)
+
+    def touch(self, conv: Conversation):
+        """Mark a cached conversation as most recently used."""
+        self._by_user.touch(conv.user_id)
+        self._by_thread.touch((conv.forum_chat_id, conv.thread_id))
+
+    def _prime_from_read(self, conv: Conversation, epoch: int):
+        if epoch == self._delete_epoch and not self._deletes_in_flight:
+            self.prime(conv)
+
+    def _forget(self, conv: Conversation):
+        self._by_user.pop(conv.user_id)
+        self._by_thread.pop((conv.forum_chat_id, conv.thread_id))
 
     async def get_by_user(self, user_id: int):
+        conv = self._by_user.get(user_id)
+        if conv is not None:
+            return conv
+        epoch = self._delete_epoch
         async with self.session_factory() as s:
-            return await s.get(Conversation, user_id)
+            conv = await s.get(Conversation, user_id)
+        if conv is not None:
+            self._prime_from_read(conv, epoch)
+        return conv
 
     async def get_by_thread(self, forum_chat_id: int, thread_id: int):
+        conv = self._by_thread.get((forum_chat_id, thread_id))
+        if conv is not None:
+            return conv
+        epoch = self._delete_epoch
         async with self.session_factory() as s:
             q = select(Conversation).where(
                 Conversation.forum_chat_id == forum_chat_id,
                 Conversation.thread_id == thread_id,
             )
             r = await s.execute(q)
-            return r.scalar_one_or_none()
+            conv = r.scalar_one_or_none()
+        if conv is not None:
+            self._prime_from_read(conv, epoch)
+        return conv
 
     async def create(self, user_id: int, forum_chat_id: int, thread_id: int):
         async with self.session_factory() as s:
@@ -36,28 +79,78 @@ class ConversationRepo:
             s.add(conv)
             try:
                 await s.commit()
+                self.prime(conv)
                 return conv
             except IntegrityError:
                 await s.rollback()
                 return await self.get_by_user(user_id)
 
     async def delete_by_thread(self, forum_chat_id: int, thread_id: int):
-        async with self.session_factory() as s:
-            q = select(Conversation).where(
-                Conversation.forum_chat_id == forum_chat_id,
-                Conversation.thread_id == thread_id,
-            )
-            r = await s.execute(q)
-            conv = r.scalar_one_or_none()
-            if conv is None:
-                return
-            await s.delete(conv)
-            await s.commit()
+        self._delete_epoch += 1
+        self._deletes_in_flight += 1
+        try:
+            # Evict even if the row is already gone (e.g. closed by another instance)
+            cached = self._by_thread.get((forum_chat_id, thread_id))
+            if cached is not None:
+                self._forget(cached)
+            async with self.session_factory() as s:
+                q = select(Conversation).where(
+                    Conversation.forum_chat_id == forum_chat_id,
+                    Conversation.thread_id == thread_id,
+                )
+                r = await s.execute(q)
+                conv = r.scalar_one_or_none()
+                if conv is None:
+                    return
+                await s.delete(conv)
+                await s.commit()
+                self._forget(conv)
+        finally:
+            self._deletes_in_flight -= 1
+            self._delete_epoch += 1
 
 
 class MessageLinkRepo:
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        cache_size: int = 0,
+        cache_ttl: float = 300.0,
+    ):
         self.session_factory = session_factory
+        # (user_id, user_message_id) -> (forum_chat_id, thread_id, group_message_id)
+        self._by_user_msg = LookupCache(cache_size, cache_ttl)
+        # (forum_chat_id, thread_id, group_message_id) -> user_message_id
+        self._by_group_msg = LookupCache(cache_size, cache_ttl)
+
+    def prime(
+        self,
+        user_id: int,
+        forum_chat_id: int,
+        thread_id: int,
+        user_message_id: int,
+        group_message_id: int,
+    ):
+        group_key = (forum_chat_id, thread_id, group_message_id)
+        self._by_user_msg.put((user_id, user_message_id), group_key)
+        self._by_group_msg.put(group_key, user_message_id)
+
+    def touch(
+        self,
+        user_id: int,
+        forum_chat_id: int,
+        thread_id: int,
+        user_message_id: int,
+        group_message_id: int,
+    ):
+        """Mark a cached link as most recently used."""
+        self._by_user_msg.touch((user_id, user_message_id))
+        self._by_group_msg.touch((forum_chat_id, thread_id, group_message_id))
+
+    def _forget_thread(self, forum_chat_id: int, thread_id: int):
+        thread = (forum_chat_id, thread_id)
+        self._by_user_msg.evict(lambda key, value: value[:2] == thread)
+        self._by_group_msg.evict(lambda key, value: key[:2] == thread)
 
     async def link(
         self,
@@ -80,8 +173,15 @@ class MessageLinkRepo:
                 await s.commit()
             except IntegrityError:
                 await s.rollback()
+                return
+        self.prime(
+            user_id, forum_chat_id, thread_id, user_message_id, group_message_id
+        )
 
     async def get_group_id(self, user_id: int, user_message_id: int):
+        cached = self._by_user_msg.get((user_id, user_message_id))
+        if cached is not None:
+            return cached[2]
         async with self.session_factory() as s:
             q = select(MessageLink.group_message_id).where(
                 MessageLink.user_id == user_id,
@@ -94,6 +194,9 @@ class MessageLinkRepo:
     async def get_user_id_by_group(
         self, forum_chat_id: int, thread_id: int, group_message_id: int
     ):
+        cached = self._by_group_msg.get((forum_chat_id, thread_id, group_message_id))
+        if cached is not None:
+            return cached
         async with self.session_factory() as s:
             q = select(MessageLink.user_message_id).where(
                 MessageLink.forum_chat_id == forum_chat_id,
@@ -105,6 +208,9 @@ class MessageLinkRepo:
             return int(res) if res is not None else None
 
     async def delete_by_thread(self, forum_chat_id: int, thread_id: int):
+        # Evict first so the cache is clean even if the DB delete fails, and
+        # again afterwards for links written while the delete was running.
+        self._forget_thread(forum_chat_id, thread_id)
         async with self.session_factory() as s:
             q = delete(MessageLink).where(
                 MessageLink.forum_chat_id == forum_chat_id,
@@ -112,3 +218,4 @@ class MessageLinkRepo:
             )
             await s.execute(q)
             await s.commit()
+        self._forget_thread(forum_chat_id, thread_id)
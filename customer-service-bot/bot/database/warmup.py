@@ -0,0 +1,189 @@
+"""Startup warm-up: open pool connections and preload recent conversations.
+
+Without it, the first message of every active user after a restart pays a
+DB round-trip for its conversation and, on a fresh instance, for opening a
+pool connection as well.
+"""
+
+import asyncio
+import logging
+import time
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from .models import Conversation, MessageLink
+from .requests import ConversationRepo, MessageLinkRepo
+
+logger = logging.getLogger(__name__)
+
+
+async def open_pool_connections(engine: AsyncEngine, count: int) -> int:
+    """Check out `count` connections at once so the pool keeps them open."""
+    pool_size = getattr(engine.pool, "size", None)
+    if callable(pool_size):
+        count = min(count, pool_size())
+    if count <= 0:
+        return 0
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(count)))
+    return count
+
+
+async def preload_conversations(
+    session_factory: async_sessionmaker[AsyncSession],
+    conv_repo: ConversationRepo,
+    msg_repo: MessageLinkRepo,
+    limit: int,
+    links_per_conversation: int,
+    batch_size: int,
+    cache_size: int,
+    stats: dict,
+):
+    """Stream the most recently active conversations into the repo caches.
+
+    Activity is the time of the latest message link; conversations without
+    any message fall back to their creation time. Rows are streamed most
+    active first, so a budget timeout still leaves the important ones loaded.
+    Both conversations and links stop at `cache_size`, and the caches are LRU:
+    once loading ends, entries are moved to the recently used end in reverse
+    activity order, so the first evictions hit the least active users.
+    Progress is counted in `stats` as batches complete.
+    """
+    limit = min(limit, cache_size)
+    if limit <= 0:
+        return
+    last_activity = (
+        select(MessageLink.user_id, func.max(MessageLink.created_at).label("ts"))
+        .group_by(MessageLink.user_id)
+        .subquery()
+    )
+    q = (
+        select(Conversation)
+        .outerjoin(last_activity, last_activity.c.user_id == Conversation.user_id)
+        .order_by(func.coalesce(last_activity.c.ts, Conversation.created_at).desc())
+        .limit(limit)
+        .execution_options(yield_per=batch_size)
+    )
+
+    # Everything primed so far, most active first
+    convs: list = []
+    links: list = []
+    try:
+        async with session_factory() as s:
+            result = await s.stream_scalars(q)
+            async for batch in result.partitions():
+                for conv in batch:
+                    conv_repo.prime(conv)
+                convs.extend(batch)
+                stats["conversations"] += len(batch)
+                rows = await _preload_links(
+                    s,
+                    msg_repo,
+                    [c.user_id for c in batch],
+                    links_per_conversation,
+                    cache_size - stats["links"],
+                )
+                links.extend(rows)
+                stats["links"] += len(rows)
+    finally:
+        # Also runs on timeout, for whatever was loaded until then
+        for row in reversed(links):
+            msg_repo.touch(
+                row.user_id,
+                row.forum_chat_id,
+                row.thread_id,
+                row.user_message_id,
+                row.group_message_id,
+            )
+        for conv in reversed(convs):
+            conv_repo.touch(conv)
+
+
+async def _preload_links(
+    s: AsyncSession,
+    msg_repo: MessageLinkRepo,
+    user_ids: list,
+    per_user: int,
+    room: int,
+) -> list:
+    """Prime the latest links of `user_ids`, at most `room`.
+
+    Returns the primed rows, most active user and newest link first.
+    """
+    if per_user <= 0 or room <= 0 or not user_ids:
+        return []
+    rank = (
+        func.row_number()
+        .over(
+            partition_by=MessageLink.user_id,
+            order_by=MessageLink.created_at.desc(),
+        )
+        .label("rank")
+    )
+    ranked = (
+        select(MessageLink, rank).where(MessageLink.user_id.in_(user_ids)).subquery()
+    )
+    q = select(ranked).where(ranked.c.rank <= per_user)
+    rows = (await s.execute(q)).all()
+    position = {user_id: i for i, user_id in enumerate(user_ids)}
+    rows.sort(key=lambda row: (position[row.user_id], row.rank))
+    rows = rows[:room]
+    for row in rows:
+        msg_repo.prime(
+            row.user_id,
+            row.forum_chat_id,
+            row.thread_id,
+            row.user_message_id,
+            row.group_message_id,
+        )
+    return rows
+
+
+async def warm_up(
+    engine: AsyncEngine,
+    session_factory: async_sessionmaker[AsyncSession],
+    conv_repo: ConversationRepo,
+    msg_repo: MessageLinkRepo,
+    pool_connections: int,
+    conversations: int,
+    links_per_conversation: int,
+    batch_size: int,
+    cache_size: int,
+    budget: float,
+):
+    """Run the warm-up, giving up (without failing startup) after `budget` seconds."""
+    started = time.perf_counter()
+    stats = {"connections": 0, "conversations": 0, "links": 0}
+    try:
+        async with asyncio.timeout(budget):
+            stats["connections"] = await open_pool_connections(
+                engine, pool_connections
+            )
+            if conversations > 0:
+                await preload_conversations(
+                    session_factory,
+                    conv_repo,
+                    msg_repo,
+                    conversations,
+                    links_per_conversation,
+                    batch_size,
+                    cache_size,
+                    stats,
+                )
+    except TimeoutError:
+        logger.warning("Warm-up exceeded its %.1fs budget, continuing startup", budget)
+    except Exception:
+        logger.exception("Warm-up failed, continuing startup")
+
+    logger.info(
+        "Warm-up took %.3fs: %d pool connections, %d conversations, %d message links",
+        time.perf_counter() - started,
+        stats["connections"],
+        stats["conversations"],
+        stats["links"],
+    )
@@ -0,0 +1,172 @@
+"""Profiling hooks for diagnosing relay latency in a running instance.
+
+- `SamplingProfiler` samples the stack of the event loop thread and renders
+  it in the collapsed-stack format understood by flamegraph.pl/speedscope.
+- `SlowUpdateRecorder` times every update, including the SQLAlchemy queries
+  and Bot API calls it made, and keeps the slow ones in a ring buffer.
+"""
+
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types.update import UpdateTypeLookupError
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Spans of the update currently being processed (None outside of an update)
+_current_spans: ContextVar[Optional[list]] = ContextVar("current_spans", default=None)
+
+MAX_SPANS_PER_UPDATE = 100
+
+
+class SamplingProfiler:
+    """Samples the stack of one thread at a fixed interval.
+
+    Sampling runs in a helper thread so the profiled event loop is only
+    paused for the time it takes to walk its frames.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(
+        self, thread_id: int, seconds: float, stop: Optional[threading.Event] = None
+    ) -> str:
+        """Blocks for `seconds` (or until `stop` is set) and returns the
+        collapsed stacks of `thread_id`."""
+        stop = stop or threading.Event()
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("Profiler is already running")
+        try:
+            stacks: Counter = Counter()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline and not stop.is_set():
+                frame = sys._current_frames().get(thread_id)
+                if frame is not None:
+                    stacks[self._collapse(frame)] += 1
+                stop.wait(self.interval)
+        finally:
+            self._lock.release()
+
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+def _add_span(kind: str, name: str, started: float):
+    spans = _current_spans.get()
+    if spans is None or len(spans) >= MAX_SPANS_PER_UPDATE:
+        return
+    spans.append(
+        {
+            "kind": kind,
+            "name": name,
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+    )
+
+
+class BotApiTimingMiddleware(BaseRequestMiddleware):
+    """Bot session middleware that records each Bot API call as a span."""
+
+    async def __call__(self, make_request, bot, method):
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            _add_span("bot_api", method.__api_method__, started)
+
+
+class SlowUpdateRecorder(BaseMiddleware):
+    """Outer update middleware keeping a breakdown of updates over a threshold."""
+
+    def __init__(self, threshold_ms: float, capacity: int = 100):
+        self.threshold_ms = threshold_ms
+        self.records: deque = deque(maxlen=capacity)
+
+    def instrument_engine(self, engine: AsyncEngine):
+        """Record the statements executed on `engine` as DB spans."""
+        sync_engine = engine.sync_engine
+
+        @sa_event.listens_for(sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, params, context, many):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        @sa_event.listens_for(sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, params, context, many):
+            started = conn.info["query_started"].pop()
+            _add_span("db", " ".join(statement.split())[:200], started)
+
+        # after_cursor_execute is skipped for failing statements
+        @sa_event.listens_for(sync_engine, "handle_error")
+        def handle_error(context):
+            conn = context.connection
+            if conn is None or not conn.info.get("query_started"):
+                return
+            started = conn.info["query_started"].pop()
+            statement = " ".join((context.statement or "").split())[:200]
+            _add_span("db", f"{statement} [failed]", started)
+
+    async def __call__(self, handler, event, data: dict[str, Any]):
+        spans: list = []
+        token = _current_spans.set(spans)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            total_ms = (time.perf_counter() - started) * 1000
+            _current_spans.reset(token)
+            if total_ms >= self.threshold_ms:
+                # Runs in `finally`: an error here must not replace the result
+                try:
+                    self._record(event, total_ms, spans)
+                except Exception:
+                    logger.exception("Failed to record slow update")
+
+    def _record(self, update, total_ms: float, spans: list):
+        try:
+            event_type = update.event_type
+        except UpdateTypeLookupError:
+            event_type = "unknown"
+        db_ms = sum(s["ms"] for s in spans if s["kind"] == "db")
+        api_ms = sum(s["ms"] for s in spans if s["kind"] == "bot_api")
+        record = {
+            "update_id": update.update_id,
+            "event_type": event_type,
+            "recorded_at": time.time(),
+            "total_ms": round(total_ms, 3),
+            "db_ms": round(db_ms, 3),
+            "bot_api_ms": round(api_ms, 3),
+            "other_ms": round(max(total_ms - db_ms - api_ms, 0.0), 3),
+            "spans": spans,
+        }
+        self.records.append(record)
+        logger.warning(
+            "Slow update %s (%s): %.1f ms (db %.1f ms, bot api %.1f ms)",
+            record["update_id"],
+            record["event_type"],
+            total_ms,
+            db_ms,
+            api_ms,
+        )
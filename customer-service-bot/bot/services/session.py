@@ -0,0 +1,66 @@
+"""HTTP session used by the aiogram Bot client to talk to the Bot API.
+
+Every relay is dominated by calls to api.telegram.org, so the connector
+(pool size, keep-alive, DNS cache) and timeouts are driven by `Settings`
+instead of the aiogram defaults.
+"""
+
+from typing import Any, Mapping, Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiogram.methods import TelegramMethod
+
+from ..config import Settings
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """AiohttpSession with a configurable connector and per-method timeouts.
+
+    The underlying `ClientSession` is created lazily on the first request and
+    reused for the lifetime of the bot, so connections to the Bot API stay
+    warm between updates.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        ttl_dns_cache: Optional[int] = 3600,
+        method_timeouts: Optional[Mapping[str, float]] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(limit=limit, **kwargs)
+        self._connector_init.update(
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=ttl_dns_cache,
+        )
+        # Keys are Bot API method names as sent on the wire, e.g. "copyMessage"
+        self.method_timeouts = dict(method_timeouts or {})
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod,
+        timeout: Optional[int] = None,
+    ):
+        if timeout is None:
+            timeout = self.method_timeouts.get(method.__api_method__)
+        return await super().make_request(bot, method, timeout=timeout)
+
+
+def make_bot_session(
+    settings: Settings, api: TelegramAPIServer = PRODUCTION
+) -> TunedAiohttpSession:
+    return TunedAiohttpSession(
+        api=api,
+        timeout=settings.BOT_API_TIMEOUT,
+        limit=settings.BOT_API_CONNECTION_LIMIT,
+        limit_per_host=settings.BOT_API_CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=settings.BOT_API_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=settings.BOT_API_DNS_CACHE_TTL,
+        method_timeouts=settings.BOT_API_METHOD_TIMEOUTS,
+    )